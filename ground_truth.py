@@ -0,0 +1,165 @@
+import os
+import sys
+from multiprocessing import resource_tracker, shared_memory
+import pandas as pd
+import numpy as np
+
+
+def _track_shared_memory(shm, track):
+    # shared_memory only registers segments with the resource tracker on POSIX, and
+    # before 3.13 it also registers segments it merely attaches to.
+    if os.name == "posix" and sys.version_info < (3, 13):
+        if track:
+            resource_tracker.register(shm._name, "shared_memory")
+        else:
+            resource_tracker.unregister(shm._name, "shared_memory")
+
+
+def _attach_shared_memory(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    # Otherwise the tracker unlinks the segment when the attaching process exits
+    _track_shared_memory(shm, False)
+    return shm
+
+
+class SharedGroundTruth:
+    """
+    Ground truth reward tables published once into shared memory (or a memory-mapped file)
+    and attached read-only from worker processes through a small descriptor.
+    """
+
+    def __init__(self, descriptor, buffer, shm=None, owner=False):
+        self.descriptor = descriptor
+        self.context_columns = descriptor["context_columns"]
+        self.action_columns = descriptor["action_columns"]
+        self.context_values = descriptor["context_values"]
+        self.action_values = descriptor["action_values"]
+        self._codes = [{v: i for i, v in enumerate(vs)}
+                       for vs in self.context_values + self.action_values]
+        self._shm = shm
+        self._owner = owner
+        self._buffer = buffer
+        # Views into the shared buffer; they never leave the class since
+        # they become invalid once the buffer is closed
+        self._arrays = {}
+        for k, (offset, dtype, shape) in descriptor["arrays"].items():
+            arr = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+            arr.flags.writeable = False
+            self._arrays[k] = arr
+
+    @classmethod
+    def publish(cls, df, name=None, path=None, context_columns=("platform", "network", "country"), action_columns=("x", "y", "z"), reward_column="reward", minimize=True):
+        context_columns = list(context_columns)
+        action_columns = list(action_columns)
+        columns = context_columns + action_columns
+        values = [sorted(df[c].unique()) for c in columns]
+        shape = tuple(len(vs) for vs in values)
+        codes = [pd.Categorical(df[c], categories=vs).codes
+                 for c, vs in zip(columns, values)]
+        flat = np.ravel_multi_index(codes, shape)
+        n_cells = int(np.prod(shape))
+        reward = df[reward_column].values.astype(np.float64)
+
+        counts = np.bincount(flat, minlength=n_cells)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_reward = np.bincount(flat, weights=reward, minlength=n_cells) / counts
+        samples = pd.DataFrame({"cell": flat, "reward": reward}).drop_duplicates()
+        samples = samples.sort_values("cell", kind="stable")
+        reward_offsets = np.zeros(n_cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(samples["cell"].values, minlength=n_cells), out=reward_offsets[1:])
+
+        n_context_cells = int(np.prod(shape[:len(context_columns)]))
+        by_context = mean_reward.reshape(n_context_cells, -1)
+        # Contexts without any rows get -1 / NaN
+        has_data = ~np.all(np.isnan(by_context), axis=1)
+        optimal_action = np.full(n_context_cells, -1, dtype=np.int64)
+        optimal_action[has_data] = (np.nanargmin if minimize else np.nanargmax)(by_context[has_data], axis=1)
+        optimal_reward = np.full(n_context_cells, np.nan)
+        optimal_reward[has_data] = by_context[has_data, optimal_action[has_data]]
+
+        arrays = {
+            "mean_reward": mean_reward.reshape(shape),
+            "reward_offsets": reward_offsets,
+            "reward_samples": samples["reward"].values.astype(np.float64),
+            "optimal_action": optimal_action,
+            "optimal_reward": optimal_reward,
+        }
+        layout = {}
+        size = 0
+        for k, arr in arrays.items():
+            layout[k] = [size, arr.dtype.str, list(arr.shape)]
+            # Keep every array 8-byte aligned
+            size += (arr.nbytes + 7) // 8 * 8
+        size = max(size, 1)
+
+        if path is not None:
+            buffer = np.memmap(path, dtype=np.uint8, mode="w+", shape=(size,))
+            shm = None
+        else:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            buffer = shm.buf
+        for k, arr in arrays.items():
+            offset, dtype, arr_shape = layout[k]
+            np.ndarray(arr_shape, dtype=dtype, buffer=buffer, offset=offset)[...] = arr
+        if path is not None:
+            buffer.flush()
+
+        descriptor = {
+            "name": shm.name if shm is not None else None,
+            "path": path,
+            "context_columns": context_columns,
+            "action_columns": action_columns,
+            "context_values": [np.array(vs).tolist() for vs in values[:len(context_columns)]],
+            "action_values": [np.array(vs).tolist() for vs in values[len(context_columns):]],
+            "minimize": minimize,
+            "arrays": layout,
+        }
+        return cls(descriptor, buffer, shm, owner=True)
+
+    @classmethod
+    def attach(cls, descriptor):
+        if descriptor["path"] is not None:
+            return cls(descriptor, np.memmap(descriptor["path"], dtype=np.uint8, mode="r"))
+        shm = _attach_shared_memory(descriptor["name"])
+        return cls(descriptor, shm.buf, shm)
+
+    def cell(self, context, action):
+        return tuple(codes[v] for codes, v in zip(self._codes, list(context) + list(action)))
+
+    def mean_reward(self, context, action):
+        return self._arrays["mean_reward"][self.cell(context, action)]
+
+    def _reward_samples(self, context, action):
+        index = np.ravel_multi_index(self.cell(context, action), self._arrays["mean_reward"].shape)
+        offsets = self._arrays["reward_offsets"]
+        return self._arrays["reward_samples"][offsets[index]:offsets[index + 1]]
+
+    def reward_samples(self, context, action):
+        return self._reward_samples(context, action).copy()
+
+    def sample_reward(self, context, action, sample_size=None):
+        return np.random.choice(self._reward_samples(context, action), sample_size)
+
+    def optimal_action(self, context):
+        context_shape = self._arrays["mean_reward"].shape[:len(self.context_columns)]
+        index = np.ravel_multi_index(self.cell(context, []), context_shape)
+        action_index = self._arrays["optimal_action"][index]
+        if action_index < 0:
+            return None, np.nan
+        action_shape = self._arrays["mean_reward"].shape[len(self.context_columns):]
+        action_codes = np.unravel_index(action_index, action_shape)
+        return tuple(vs[i] for vs, i in zip(self.action_values, action_codes)), self._arrays["optimal_reward"][index]
+
+    def close(self):
+        self._arrays = {}
+        self._buffer = None
+        if self._shm is not None:
+            self._shm.close()
+            if self._owner:
+                # Attached workers unregister the segment from a tracker they may share
+                # with this process, so register it again before unlinking.
+                _track_shared_memory(self._shm, True)
+                self._shm.unlink()
+            self._shm = None
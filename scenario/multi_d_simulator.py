@@ -1,6 +1,8 @@
 import copy
 import itertools
+import json
 import os
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 np.random.seed(7)
@@ -13,6 +15,10 @@ class MultiDSimulator:
     Generate simulated datasets for the multi-d scenario.
     """
 
+    # Base distributions shared by simulators that only differ in their discretization policy
+    base_cache = OrderedDict()
+    base_cache_size = 4
+
     def __init__(self, **kwargs):
         self.folder_path = kwargs['folder_path']
         self.contexts = kwargs['contexts']
@@ -32,6 +38,8 @@ class MultiDSimulator:
         self.ci_mean = kwargs.get('ci_mean', 0)
         self.ci_std = kwargs.get('ci_std', 0.01)
         self.ci_width = kwargs.get('ci_width', (self.reward_range[1]-self.reward_range[0])/50)
+        self.inter_terms = None
+        self.coefficients_base = None
         self.update_args()
         self.summarize_task()
         
@@ -122,6 +130,64 @@ class MultiDSimulator:
             self.plot_1d_param_reward(param_reward)    
         return param_reward
 
+    def gen_base_distributions(self, seed, n_dist=5000):
+        n_dist = max(n_dist, self.max_discretization)
+        key = json.dumps([seed, n_dist, self.contexts, self.actions, self.reward_range, self.reward_minimization,
+                          self.interaction_level, self.coefficient_range, self.coefficient_scale_range,
+                          self.dist_mean_change_range, self.dist_std_change_range, self.ci_mean, self.ci_std,
+                          self.discretization_fine_grain, self.discretization_base], sort_keys=True)
+        if key in self.base_cache:
+            self.base_cache.move_to_end(key)
+        else:
+            np.random.seed(seed)
+            # Redraw the error distribution so the seed controls every random draw
+            self.ci_dist = self.gen_distribution('normal', self.ci_mean, self.ci_std, 5000)[0]
+            config_base = self.gen_param_reward(n_dist, plot=False)
+            self.inter_terms, self.coefficients_base = self.gen_coefficients()
+            self.random_changes()
+            config_context = {}
+            ground_truth = {}
+            for c in self.unique_contexts:
+                c_name = '_'.join(c)
+                self.adjust_distributuion(config_context, config_base, c, plot=False)
+                # Ground truth on the fine grain grid, independent of the discretization policy
+                c_coeff = self.adjust_coefficients(c)
+                self.discretize(config_context[c_name], coefficients=c_coeff)
+                config_context[c_name]['configs']['coefficients'] = c_coeff
+                num_values, reward_raw_min, reward_raw_max = self.gen_data(
+                    config_context[c_name], 1, coefficients=c_coeff, add_error=False)
+                num_values.flags.writeable = False
+                # Only the per-configuration arrays are large, and the discretized data regenerates them
+                for x in ['config_idx', 'config_val', 'config_rterms', 'config_reward']:
+                    config_context[c_name]['configs'].pop(x)
+                ground_truth[c_name] = {
+                    'num_values': num_values,
+                    'reward_raw_min': reward_raw_min,
+                    'reward_raw_max': reward_raw_max,
+                    'summary': self.summarize_df(pd.DataFrame(), c, num_values),
+                }
+            self.base_cache[key] = {
+                'config_base': config_base,
+                'config_context': config_context,
+                'ground_truth': ground_truth,
+                'inter_terms': self.inter_terms,
+                'coefficients_base': self.coefficients_base,
+                'context_dist_change': self.context_dist_change,
+                'ci_dist': self.ci_dist,
+                'random_state': np.random.get_state(),
+            }
+            while len(self.base_cache) > self.base_cache_size:
+                self.base_cache.popitem(last=False)
+        cached = self.base_cache[key]
+        self.inter_terms = cached['inter_terms']
+        self.coefficients_base = cached['coefficients_base'].copy()
+        self.context_dist_change = copy.deepcopy(cached['context_dist_change'])
+        self.ci_dist = cached['ci_dist']
+        # Continue from the same random state as an uncached run. This resets the global
+        # numpy RNG, discarding any draws made since the entry was cached.
+        np.random.set_state(cached['random_state'])
+        return copy.deepcopy(cached['config_base']), copy.deepcopy(cached['config_context']), cached['ground_truth']
+
     def gen_coefficients(self):
         inter_terms = []
         for i in range(1, self.interaction_level):
@@ -151,7 +217,8 @@ class MultiDSimulator:
         if discretization_policy is None:
             discretization_policy = self.discretization_base
         if coefficients is None:
-            self.inter_terms, self.coefficients_base  = self.gen_coefficients()
+            if self.coefficients_base is None:
+                self.inter_terms, self.coefficients_base  = self.gen_coefficients()
             coefficients = self.coefficients_base 
         self.discretize_parameters(dist, discretization_policy)
         self.reward_formula = ['f<sub>{0}</sub>({0})'.format(p) for p in self.param_list] + [''.join(['f<sub>{0}</sub>({0})'.format(self.param_list[y]) for y in x]) for x in self.inter_terms]
@@ -309,9 +376,39 @@ class MultiDSimulator:
         df_mean['config'] = df_mean.index.values
         df_mean['context'] = str(context)
         df_mean.reset_index(inplace=True, drop=True)
-        df_summary = df_summary.append(df_mean)
+        df_summary = pd.concat([df_summary, df_mean])
         return df_summary
 
+    def simulate(self, seed, n_dist=5000, plot=False, verbose=False):
+        config_base, config_context, ground_truth = self.gen_base_distributions(seed, n_dist)
+        if plot:
+            self.plot_1d_param_reward(config_base)
+            self.discretize(config_base)
+            self.gen_data(config_base, 1, add_error=False, plot_2d=True)
+        config_output = {}
+        df_summary = []
+        df_all = []
+        for j, c in enumerate(self.unique_contexts):
+            c_name = '_'.join(c)
+            if verbose:
+                print('>>> [{0}/{1}] Generating data for context {2}'.format(j+1, len(self.unique_contexts), c_name))
+            c_coeff = config_context[c_name]['configs']['coefficients']
+            c_truth = ground_truth[c_name]
+            if plot:
+                self.plot_1d_param_reward(config_context[c_name])
+                self.plot_2d_paris(pd.DataFrame(c_truth['num_values'].copy(), columns=self.param_list+['reward']))
+            # Output data by the specified discretization policy
+            discretized_context = copy.deepcopy(config_context[c_name])
+            self.discretize(discretized_context, discretization_policy=self.discretization_policy, coefficients=c_coeff)
+            discretized_data, _, _ = self.gen_data(
+                discretized_context, self.n_per_config, coefficients=c_coeff, add_error=True,
+                data_min=c_truth['reward_raw_min'], data_max=c_truth['reward_raw_max'], plot_2d=plot)
+            config_context[c_name]['configs']['errors'] = self.ci_dist
+            config_output[c_name] = self.update_output_config(config_context[c_name])
+            df_all.append(self.export_data(c, discretized_data, to_file=False))
+            df_summary.append(c_truth['summary'])
+        return pd.concat(df_summary), pd.concat(df_all), config_output
+
     @staticmethod
     def gen_trajectory(df_summary, length, include_sample_size=True, sample_size=1, include_reward=True):
         ss = df_summary.sample(length, replace=True).reset_index(drop=True).copy()
@@ -1,3 +1,6 @@
+import ast
+import gzip
+import os
 import pandas as pd
 import numpy as np
 from vowpalwabbit import pyvw
@@ -170,3 +173,97 @@ def sample_index(id_prob_pairs):
     ids = [item[0] for item in id_prob_pairs]
     probabilities = normalize([item[1] for item in id_prob_pairs])
     return np.random.choice(len(ids), p=probabilities)
+
+
+def expand_trajectory(df_trajectory, context_columns=("platform", "network", "country"), action_columns=("x", "y", "z")):
+    # Exporting also needs a reward per row, so trajectories read without one should
+    # go through TrajectoryEvaluation.complete_trajectory first.
+    def parse(value):
+        # Trajectories read back from csv hold strings, in memory they hold tuples/lists
+        return ast.literal_eval(value) if isinstance(value, str) else value
+
+    df = df_trajectory.copy()
+    df[list(context_columns)] = pd.DataFrame(
+        [parse(c) for c in df["context"]], index=df.index)
+    df[list(action_columns)] = pd.DataFrame(
+        [parse(c) for c in df["config"]], index=df.index)
+    return df
+
+
+def export_vw_examples(df, path, example_type="slates", context_columns=("platform", "network", "country"), action_columns=("x", "y", "z"), cost_column="reward", prob_column=None, action_values=None, shared_fmt="platform={platform} region={country} connection={network}", num_shards=1, compress=False):
+    create_funcs = {
+        "slates": create_native_slates_example,
+        "ccb": create_slates_example,
+        "cb": create_cb_example,
+    }
+    if example_type not in create_funcs:
+        raise ValueError('example_type must be in ["slates", "ccb", "cb"]')
+    if num_shards < 1:
+        raise ValueError("num_shards must be at least 1")
+    create_example = create_funcs[example_type]
+    context_columns = list(context_columns)
+    action_columns = list(action_columns)
+    if cost_column not in df.columns:
+        raise ValueError("Column {} is missing; complete the trajectory with TrajectoryEvaluation.complete_trajectory first".format(cost_column))
+
+    # The action grid must match the one used for online training and prediction, so
+    # pass the full grid (e.g. sim.discretization_policy) when df does not cover it.
+    if action_values is None:
+        values = [sorted(df[c].unique()) for c in action_columns]
+    else:
+        if isinstance(action_values, dict):
+            action_values = [action_values[c] for c in action_columns]
+        for c, vs in zip(action_columns, action_values):
+            if isinstance(vs, int):
+                raise ValueError("action_values for column {} must list the grid values, not a count "
+                                 "(use share_discretized_grid=True in the simulator)".format(c))
+        values = [list(vs) for vs in action_values]
+    for c, vs in zip(action_columns, values):
+        missing = set(df[c].unique()) - set(vs)
+        if missing:
+            raise ValueError("Values {} of column {} are not in action_values".format(sorted(missing), c))
+    value_index = [{v: i for i, v in enumerate(vs)} for vs in values]
+    action_sets = [["{}={}".format(c, v) for v in vs]
+                   for c, vs in zip(action_columns, values)]
+    all_string_actions = combine(values, action_columns, fmt_str="{}={},{}")
+
+    root, ext = os.path.splitext(path)
+    if num_shards > 1:
+        paths = ["{}_{}{}".format(root, i, ext) for i in range(num_shards)]
+    else:
+        paths = [path]
+    if compress:
+        paths = [p + ".gz" for p in paths]
+    files = [gzip.open(p, "wt") if compress else open(p, "w") for p in paths]
+
+    columns = context_columns + action_columns + [cost_column]
+    if prob_column is not None:
+        columns.append(prob_column)
+    n_context = len(context_columns)
+    n_action = len(action_columns)
+
+    try:
+        for i, row in enumerate(df[columns].itertuples(index=False)):
+            shared = shared_fmt.format(**dict(zip(context_columns, row[:n_context])))
+            chosen = [value_index[j][v]
+                      for j, v in enumerate(row[n_context:n_context + n_action])]
+            cost = row[n_context + n_action]
+            if example_type == "cb":
+                # Index into the cartesian product built by combine
+                chosen_index = 0
+                for j, c in enumerate(chosen):
+                    chosen_index = chosen_index * len(values[j]) + c
+                prob = row[-1] if prob_column is not None else 1.0 / len(all_string_actions)
+                examples = create_example(
+                    None, shared, all_string_actions, (chosen_index, cost, prob), debug=True)
+            else:
+                outcome = [(c, cost, row[-1] if prob_column is not None else 1.0 / len(vs))
+                           for c, vs in zip(chosen, values)]
+                examples = create_example(
+                    None, shared, action_sets, outcome, debug=True)
+            # Multiline examples are separated by an empty line
+            files[i % num_shards].write("\n".join(examples) + "\n\n")
+    finally:
+        for f in files:
+            f.close()
+    return paths
@@ -0,0 +1,72 @@
+import json
+import sys
+sys.path.append('..')
+
+import numpy as np
+import pandas as pd
+
+from ground_truth import SharedGroundTruth
+
+
+def ground_truth_df():
+    return pd.DataFrame([
+        ["Mac", 1.0, 3.0, 0.25], ["Mac", 1.0, 3.0, 0.35], ["Mac", 2.0, 3.0, 0.1],
+        ["Windows", 1.0, 3.0, 0.5], ["Windows", 2.0, 3.0, 0.75], ["Windows", 2.0, 3.0, 0.75],
+    ], columns=["platform", "x", "y", "reward"])
+
+
+def check_ground_truth(table):
+    assert table.mean_reward(["Mac"], [1.0, 3.0]) == 0.3
+    assert sorted(table.reward_samples(["Mac"], [1.0, 3.0])) == [0.25, 0.35]
+    assert list(table.reward_samples(["Windows"], [2.0, 3.0])) == [0.75]
+    assert table.sample_reward(["Mac"], [1.0, 3.0]) in [0.25, 0.35]
+    assert table.optimal_action(["Mac"]) == ((2.0, 3.0), 0.1)
+    assert table.optimal_action(["Windows"]) == ((1.0, 3.0), 0.5)
+    samples = table.reward_samples(["Mac"], [1.0, 3.0])
+    samples[:] = 0
+    assert sorted(table.reward_samples(["Mac"], [1.0, 3.0])) == [0.25, 0.35]
+
+
+def test_shared_ground_truth_shared_memory():
+    published = SharedGroundTruth.publish(
+        ground_truth_df(), context_columns=["platform"], action_columns=["x", "y"])
+    attached = SharedGroundTruth.attach(json.loads(json.dumps(published.descriptor)))
+    check_ground_truth(attached)
+    attached.close()
+    published.close()
+
+
+def test_shared_ground_truth_memmap(tmp_path):
+    published = SharedGroundTruth.publish(
+        ground_truth_df(), path=str(tmp_path / "ground_truth.bin"), context_columns=["platform"], action_columns=["x", "y"])
+    attached = SharedGroundTruth.attach(published.descriptor)
+    check_ground_truth(attached)
+    attached.close()
+    published.close()
+
+
+def test_shared_ground_truth_results_outlive_close():
+    published = SharedGroundTruth.publish(
+        ground_truth_df(), context_columns=["platform"], action_columns=["x", "y"])
+    attached = SharedGroundTruth.attach(published.descriptor)
+    samples = attached.reward_samples(["Mac"], [1.0, 3.0])
+    mean = attached.mean_reward(["Mac"], [1.0, 3.0])
+    action, reward = attached.optimal_action(["Mac"])
+    attached.close()
+    published.close()
+    assert sorted(samples) == [0.25, 0.35]
+    assert samples.sum() == 0.6
+    assert (mean, action, reward) == (0.3, (2.0, 3.0), 0.1)
+
+
+def test_shared_ground_truth_missing_context():
+    df = pd.DataFrame([
+        ["Mac", "wifi", 1.0, 0.25], ["Mac", "wifi", 2.0, 0.1],
+        ["Windows", "wired", 1.0, 0.5], ["Windows", "wired", 2.0, 0.75],
+    ], columns=["platform", "network", "x", "reward"])
+    published = SharedGroundTruth.publish(
+        df, context_columns=["platform", "network"], action_columns=["x"])
+    assert published.optimal_action(["Mac", "wifi"]) == ((2.0,), 0.1)
+    action, reward = published.optimal_action(["Mac", "wired"])
+    assert action is None and np.isnan(reward)
+    published.close()
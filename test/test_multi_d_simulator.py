@@ -0,0 +1,109 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scenario'))
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from multi_d_simulator import MultiDSimulator
+
+
+def simulator(tmp_path, discretization_policy):
+    return MultiDSimulator(
+        folder_path=str(tmp_path),
+        contexts={'platform': ['Mac', 'Windows'], 'network': ['wifi', 'wired']},
+        actions={
+            'x': {'mean': 2, 'min': 0, 'max': 4, 'std_range': [0.1, 2.0]},
+            'y': {'mean': 1, 'min': 0, 'max': 3, 'std_range': [0.1, 2.0]},
+        },
+        discretization_fine_grain=10,
+        discretization_policy=discretization_policy,
+        reward_range=[0.05, 0.35],
+        reward_minimization=True,
+        known_n_per_config=2,
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_base_cache():
+    MultiDSimulator.base_cache.clear()
+    yield
+    MultiDSimulator.base_cache.clear()
+
+
+def assert_dist_equal(a, b):
+    assert a.keys() == b.keys()
+    for k in a:
+        if k == 'configs':
+            np.testing.assert_array_equal(a[k]['coefficients'], b[k]['coefficients'])
+            continue
+        for x in ['raw', 'tick', 'pdf']:
+            np.testing.assert_array_equal(a[k][x], b[k][x])
+        assert a[k]['dist_inputs'] == b[k]['dist_inputs']
+
+
+def test_gen_base_distributions_hit_matches_miss(tmp_path):
+    sim = simulator(tmp_path, {'x': 4, 'y': 3})
+    base_miss, context_miss, truth_miss = sim.gen_base_distributions(7, n_dist=200)
+    coefficients_miss = sim.coefficients_base.copy()
+    MultiDSimulator.base_cache.clear()
+    sim.gen_base_distributions(7, n_dist=200)
+    base_hit, context_hit, truth_hit = sim.gen_base_distributions(7, n_dist=200)
+    assert_dist_equal(base_miss, base_hit)
+    assert context_miss.keys() == context_hit.keys()
+    for c in context_miss:
+        assert_dist_equal(context_miss[c], context_hit[c])
+        np.testing.assert_array_equal(truth_miss[c]['num_values'], truth_hit[c]['num_values'])
+        pd.testing.assert_frame_equal(truth_miss[c]['summary'], truth_hit[c]['summary'])
+    np.testing.assert_array_equal(coefficients_miss, sim.coefficients_base)
+
+
+def test_gen_base_distributions_shared_across_discretization_policies(tmp_path):
+    sim_a = simulator(tmp_path, {'x': 4, 'y': 3})
+    base_a, _, _ = sim_a.gen_base_distributions(7, n_dist=200)
+    sim_b = simulator(tmp_path, {'x': 8, 'y': 6})
+    base_b, _, _ = sim_b.gen_base_distributions(7, n_dist=200)
+    assert len(MultiDSimulator.base_cache) == 1
+    assert_dist_equal(base_a, base_b)
+
+
+def test_gen_base_distributions_lru_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr(MultiDSimulator, 'base_cache_size', 2)
+    sim = simulator(tmp_path, {'x': 4, 'y': 3})
+    sim.gen_base_distributions(1, n_dist=200)
+    sim.gen_base_distributions(2, n_dist=200)
+    sim.gen_base_distributions(1, n_dist=200)
+    sim.gen_base_distributions(3, n_dist=200)
+    assert [json.loads(k)[0] for k in MultiDSimulator.base_cache] == [1, 3]
+
+
+def test_simulate_independent_of_global_random_state(tmp_path):
+    np.random.seed(1)
+    df_summary_miss, df_all_miss, config_miss = simulator(tmp_path, {'x': 4, 'y': 3}).simulate(7, n_dist=200)
+    np.random.seed(2)
+    sim = simulator(tmp_path, {'x': 4, 'y': 3})
+    sim.discretize(sim.gen_base_distributions(7, n_dist=200)[0])
+    df_summary_hit, df_all_hit, config_hit = sim.simulate(7, n_dist=200)
+    pd.testing.assert_frame_equal(df_summary_miss, df_summary_hit)
+    pd.testing.assert_frame_equal(df_all_miss, df_all_hit)
+    assert config_miss == config_hit
+    assert len(df_all_hit) == 4 * 4 * 3 * 2
+
+
+def test_simulate_warm_skips_ground_truth(tmp_path, monkeypatch):
+    simulator(tmp_path, {'x': 4, 'y': 3}).simulate(7, n_dist=200)
+    sim = simulator(tmp_path, {'x': 8, 'y': 6})
+    policies = []
+    discretize = sim.discretize
+    def record(dist, discretization_policy=None, coefficients=None):
+        policies.append(discretization_policy)
+        discretize(dist, discretization_policy, coefficients)
+    monkeypatch.setattr(sim, 'discretize', record)
+    monkeypatch.setattr(sim, 'summarize_df', None)
+    df_summary, df_all, _ = sim.simulate(7, n_dist=200)
+    assert policies == [sim.discretization_policy] * len(sim.unique_contexts)
+    assert len(df_summary) == 4 * 10 * 10
+    assert len(df_all) == 4 * 8 * 6 * 2
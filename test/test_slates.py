@@ -1,7 +1,14 @@
+import gzip
+import os
 import sys
 sys.path.append('..')
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scenario'))
+
+import pandas as pd
+import pytest
 
 import slates
+from multi_d_simulator import MultiDSimulator
 
 
 def test_combine_float_actions():
@@ -86,4 +93,83 @@ def test_create_combinatorial_cb_example_with_outcome():
 def test_combine():
     assert slates.combine([[1,2],[3]], ["x", "y"]) == ["x=1 y=3", "x=2 y=3"]
     assert slates.combine([[1,2],[3]], ["x", "y"], fmt_str="{}={},{}") == ["x=1,y=3", "x=2,y=3"]
-    
\ No newline at end of file
+    
+
+def test_export_vw_examples_slates(tmp_path):
+    df = pd.DataFrame([["Mac", 1, 3, 0.25], ["Windows", 2, 3, 0.5]],
+                      columns=["platform", "x", "y", "reward"])
+    paths = slates.export_vw_examples(df, str(tmp_path / "slates.txt"), context_columns=["platform"], action_columns=["x", "y"],
+                                      shared_fmt="platform={platform}")
+    with open(paths[0]) as f:
+        assert f.read() == "\n".join(slates.create_native_slates_example(
+            None, "platform=Mac", [["x=1", "x=2"], ["y=3"]], [(0, 0.25, 0.5), (0, 0.25, 1.0)], debug=True)) + "\n\n" + "\n".join(slates.create_native_slates_example(
+            None, "platform=Windows", [["x=1", "x=2"], ["y=3"]], [(1, 0.5, 0.5), (0, 0.5, 1.0)], debug=True)) + "\n\n"
+
+
+def test_export_vw_examples_cb_sharded_compressed(tmp_path):
+    df = pd.DataFrame([["Mac", 1, 3, 0.25], ["Windows", 2, 4, 0.5], ["Mac", 2, 3, 0.75]],
+                      columns=["platform", "x", "y", "reward"])
+    paths = slates.export_vw_examples(df, str(tmp_path / "cb.txt"), example_type="cb", context_columns=["platform"],
+                                      action_columns=["x", "y"], shared_fmt="platform={platform}", num_shards=2, compress=True)
+    assert paths == [str(tmp_path / "cb_0.txt.gz"), str(tmp_path / "cb_1.txt.gz")]
+    with gzip.open(paths[1], "rt") as f:
+        assert f.read() == "\n".join([
+            "shared |User platform=Windows",
+            "|Action x=1,y=3",
+            "|Action x=1,y=4",
+            "|Action x=2,y=3",
+            "3:0.5:0.25 |Action x=2,y=4",
+        ]) + "\n\n"
+    with gzip.open(paths[0], "rt") as f:
+        assert f.read().count("\n\n") == 2
+
+
+def test_export_vw_examples_action_values(tmp_path):
+    df = pd.DataFrame([["Mac", "wifi", "CA", 2, 3, 0.25]],
+                      columns=["platform", "network", "country", "x", "y", "reward"])
+    paths = slates.export_vw_examples(df, str(tmp_path / "ccb.txt"), example_type="ccb", action_columns=["x", "y"],
+                                      action_values={"x": [1, 2], "y": [3, 4]})
+    with open(paths[0]) as f:
+        assert f.read() == "\n".join(slates.create_slates_example(
+            None, "platform=Mac region=CA connection=wifi", [["x=1", "x=2"], ["y=3", "y=4"]],
+            [(1, 0.25, 0.5), (0, 0.25, 0.5)], debug=True)) + "\n\n"
+    with pytest.raises(ValueError):
+        slates.export_vw_examples(df, str(tmp_path / "ccb.txt"), action_columns=["x", "y"],
+                                  action_values={"x": [1], "y": [3, 4]})
+    with pytest.raises(ValueError):
+        slates.export_vw_examples(df, str(tmp_path / "ccb.txt"), action_columns=["x", "y"],
+                                  action_values={"x": 2, "y": [3, 4]})
+
+
+def test_export_vw_examples_missing_cost(tmp_path):
+    df = pd.DataFrame([["Mac", "wifi", "CA", 1]], columns=["platform", "network", "country", "x"])
+    with pytest.raises(ValueError, match="complete_trajectory"):
+        slates.export_vw_examples(df, str(tmp_path / "slates.txt"), action_columns=["x"])
+
+
+def test_export_vw_examples_num_shards(tmp_path):
+    df = pd.DataFrame([["Mac", "wifi", "CA", 1, 0.25]],
+                      columns=["platform", "network", "country", "x", "reward"])
+    with pytest.raises(ValueError):
+        slates.export_vw_examples(df, str(tmp_path / "slates.txt"), action_columns=["x"], num_shards=0)
+    assert not os.listdir(str(tmp_path))
+
+
+def test_expand_trajectory():
+    df = pd.DataFrame([["('Mac', 'wifi', 'CA')", "(3.79, 0.11, 1.05)", 1]],
+                      columns=["context", "config", "sample_size"])
+    df = slates.expand_trajectory(df)
+    assert list(df.iloc[0][["platform", "network", "country", "x", "y", "z"]]) == [
+        "Mac", "wifi", "CA", 3.79, 0.11, 1.05]
+
+
+def test_expand_trajectory_in_memory():
+    df_summary = pd.DataFrame({"reward": [0.1, 0.2]}, index=pd.MultiIndex.from_tuples(
+        [(1.0, 2.0, 4.0), (2.0, 2.0, 4.0)], names=["x", "y", "z"]))
+    df_summary["config"] = df_summary.index.values
+    df_summary["context"] = str(["Mac", "wifi", "CA"])
+    df_summary.reset_index(inplace=True, drop=True)
+    df_trajectory = MultiDSimulator.gen_trajectory(df_summary, 5)
+    df = slates.expand_trajectory(df_trajectory)
+    assert set(df["platform"]) == {"Mac"}
+    assert set(zip(df["x"], df["y"], df["z"])) <= {(1.0, 2.0, 4.0), (2.0, 2.0, 4.0)}